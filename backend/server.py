@@ -1,14 +1,20 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Query, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import uuid
 import os
+import asyncio
 from dotenv import load_dotenv
 import motor.motor_asyncio
+from pymongo import UpdateOne, ReplaceOne, DeleteOne, ReturnDocument, ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError
 from bson import ObjectId
+from jose import jwk, jwt, JWTError
+from passlib.context import CryptContext
 import logging
 
 # Load environment variables
@@ -38,12 +44,51 @@ client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URL)
 db = client[DATABASE_NAME]
 
 # Collections
+users_collection = db.users
 goals_collection = db.goals
 categories_collection = db.categories
 progress_collection = db.progress
 
+# Cold tier: completed goals and their progress are moved here once they age out
+goals_archive_collection = db.goals_archive
+progress_archive_collection = db.progress_archive
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "200"))
+
+# Progress storage: "collection" keeps one progress document per step,
+# "embedded" stores step_progress on the goal next to steps, and "migrating"
+# writes both while migrate_progress_to_embedded backfills existing goals.
+PROGRESS_STORAGE = os.getenv("PROGRESS_STORAGE", "collection")
+if PROGRESS_STORAGE not in ("collection", "migrating", "embedded"):
+    raise ValueError(f"Unknown PROGRESS_STORAGE: {PROGRESS_STORAGE}")
+PROGRESS_MIGRATION_BATCH_SIZE = int(os.getenv("PROGRESS_MIGRATION_BATCH_SIZE", "200"))
+
+# Progress write coalescing: buffer rapid step toggles per goal for this many
+# milliseconds and flush them as one bulk write. 0 disables coalescing.
+PROGRESS_COALESCE_WINDOW_MS = int(os.getenv("PROGRESS_COALESCE_WINDOW_MS", "0"))
+
 # Security
+JWT_SECRET = os.getenv("JWT_SECRET")
+if not JWT_SECRET:
+    raise RuntimeError("JWT_SECRET must be set; tokens cannot be signed with a default key")
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+JWT_EXPIRE_MINUTES = int(os.getenv("JWT_EXPIRE_MINUTES", "1440"))
+
+# The signing key is parsed once so token verification is pure CPU work
+jwt_key = jwk.construct(JWT_SECRET, JWT_ALGORITHM)
+
 security = HTTPBearer()
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Verified against when an email is unknown, so both login paths cost one bcrypt check
+DUMMY_PASSWORD_HASH = pwd_context.hash(uuid.uuid4().hex)
+
+# bcrypt is deliberately slow; keep it off the event loop and the default executor
+password_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PASSWORD_HASH_WORKERS", "4")),
+    thread_name_prefix="bcrypt"
+)
 
 # Pydantic models
 class CategoryModel(BaseModel):
@@ -91,10 +136,19 @@ class GoalUpdateModel(BaseModel):
     resources: Optional[List[dict]] = None
 
 class ProgressUpdateModel(BaseModel):
-    step_index: int
+    step_index: int = Field(ge=0)
     completed: bool
     notes: Optional[str] = None
 
+class UserRegisterModel(BaseModel):
+    email: str
+    password: str = Field(min_length=6)
+    name: Optional[str] = None
+
+class UserLoginModel(BaseModel):
+    email: str
+    password: str
+
 # Helper functions
 def goal_helper(goal) -> dict:
     return {
@@ -109,7 +163,26 @@ def goal_helper(goal) -> dict:
         "resources": goal.get("resources", []),
         "created_at": goal["created_at"],
         "updated_at": goal["updated_at"],
-        "completed_at": goal.get("completed_at")
+        "completed_at": goal.get("completed_at"),
+        "archived": "archived_at" in goal
+    }
+
+def progress_helper(progress) -> dict:
+    return {
+        "id": progress["id"],
+        "goal_id": progress["goal_id"],
+        "step_index": progress["step_index"],
+        "completed": progress["completed"],
+        "completed_at": progress.get("completed_at"),
+        "notes": progress.get("notes")
+    }
+
+def user_helper(user) -> dict:
+    return {
+        "id": user["id"],
+        "email": user["email"],
+        "name": user.get("name"),
+        "created_at": user["created_at"]
     }
 
 def category_helper(category) -> dict:
@@ -121,20 +194,517 @@ def category_helper(category) -> dict:
         "created_at": category["created_at"]
     }
 
-async def calculate_progress_percentage(goal_id: str) -> float:
+def stats_helper(total_goals: int, completed_goals: int, active_goals: int, archived_goals: int = 0) -> dict:
+    # Archived goals are always completed, so they count towards both totals
+    total_goals += archived_goals
+    completed_goals += archived_goals
+    return {
+        "total_goals": total_goals,
+        "completed_goals": completed_goals,
+        "active_goals": active_goals,
+        "archived_goals": archived_goals,
+        "completion_rate": (completed_goals / total_goals * 100) if total_goals > 0 else 0
+    }
+
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, pwd_context.hash, password)
+
+async def verify_password(password: str, password_hash: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, pwd_context.verify, password, password_hash)
+
+def create_access_token(user_id: str) -> str:
+    now = datetime.utcnow()
+    claims = {"sub": user_id, "iat": now, "exp": now + timedelta(minutes=JWT_EXPIRE_MINUTES)}
+    return jwt.encode(claims, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+async def get_current_user_id(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> str:
+    """Resolve the user from the bearer token without touching the database"""
+    try:
+        claims = jwt.decode(credentials.credentials, jwt_key, algorithms=[JWT_ALGORITHM])
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz veya süresi dolmuş oturum",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    user_id = claims.get("sub")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz veya süresi dolmuş oturum",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return user_id
+
+async def calculate_progress_percentage(user_id: str, goal_id: str) -> float:
     """Calculate progress percentage based on completed steps"""
-    goal = await goals_collection.find_one({"id": goal_id})
+    goal = await goals_collection.find_one({"user_id": user_id, "id": goal_id})
     if not goal or not goal.get("steps"):
         return 0.0
     
     total_steps = len(goal["steps"])
     completed_steps = await progress_collection.count_documents({
+        "user_id": user_id,
         "goal_id": goal_id,
         "completed": True
     })
     
     return (completed_steps / total_steps) * 100 if total_steps > 0 else 0.0
 
+async def refresh_goal_percentage(user_id: str, goal_id: str) -> Optional[float]:
+    """Recompute and store the progress percentage of a goal, None if it is gone"""
+    new_percentage = await calculate_progress_percentage(user_id, goal_id)
+    result = await goals_collection.update_one(
+        {"user_id": user_id, "id": goal_id},
+        {"$set": {"progress_percentage": new_percentage, "updated_at": datetime.now()}}
+    )
+    return new_percentage if result.matched_count else None
+
+def progress_upsert(user_id: str, goal_id: str, progress_data: dict) -> tuple:
+    """Build the filter and update that upsert a single step's progress record"""
+    return (
+        {"user_id": user_id, "goal_id": goal_id, "step_index": progress_data["step_index"]},
+        {"$set": progress_data, "$setOnInsert": {"id": str(uuid.uuid4())}}
+    )
+
+def embedded_progress_entry(progress_data: dict) -> dict:
+    return {
+        "step_index": progress_data["step_index"],
+        "completed": progress_data["completed"],
+        "completed_at": progress_data.get("completed_at"),
+        "notes": progress_data.get("notes")
+    }
+
+def embedded_progress_list(goal) -> List[dict]:
+    """Render a goal's step_progress in the progress collection's response shape"""
+    return [
+        {
+            "id": entry.get("id"),
+            "goal_id": goal["id"],
+            "step_index": entry["step_index"],
+            "completed": entry["completed"],
+            "completed_at": entry.get("completed_at"),
+            "notes": entry.get("notes")
+        }
+        for entry in goal.get("step_progress") or []
+        if entry
+    ]
+
+def embedded_progress_pipeline(updates: List[dict]) -> list:
+    """Build an update pipeline that writes step_progress entries and the percentage in one go"""
+    current = {"$ifNull": ["$step_progress", []]}
+    pipeline = []
+    for progress_data in updates:
+        step_index = progress_data["step_index"]
+        new_entry = {"$let": {
+            "vars": {"old": {"$arrayElemAt": [current, step_index]}},
+            "in": {"$mergeObjects": [
+                {"$literal": embedded_progress_entry(progress_data)},
+                {"id": {"$ifNull": ["$$old.id", str(uuid.uuid4())]}}
+            ]}
+        }}
+        # Setting an index past the end pads the array with nulls
+        pipeline.append({"$set": {"step_progress": {"$map": {
+            "input": {"$range": [0, {"$max": [{"$size": current}, step_index + 1]}]},
+            "as": "idx",
+            "in": {"$cond": [
+                {"$eq": ["$$idx", step_index]},
+                new_entry,
+                {"$arrayElemAt": [current, "$$idx"]}
+            ]}
+        }}}})
+    
+    total_steps = {"$size": {"$ifNull": ["$steps", []]}}
+    completed_steps = {"$size": {"$filter": {
+        "input": "$step_progress",
+        "cond": {"$eq": ["$$this.completed", True]}
+    }}}
+    pipeline.append({"$set": {
+        "progress_percentage": {"$cond": [
+            {"$gt": [total_steps, 0]},
+            {"$multiply": [{"$divide": [completed_steps, total_steps]}, 100]},
+            0.0
+        ]},
+        "updated_at": {"$literal": datetime.now()}
+    }})
+    return pipeline
+
+def existing_steps_filter(updates: List[dict]) -> dict:
+    """Match only goals that actually have every step being updated"""
+    return {f"steps.{data['step_index']}": {"$exists": True} for data in updates}
+
+async def progress_target_error(user_id: str, goal_id: str) -> HTTPException:
+    """Explain why a progress write matched no goal"""
+    if await goals_collection.count_documents({"user_id": user_id, "id": goal_id}, limit=1):
+        return HTTPException(status_code=400, detail="Geçersiz adım numarası")
+    return HTTPException(status_code=404, detail="Hedef bulunamadı")
+
+async def write_embedded_progress(
+    user_id: str, goal_id: str, updates: List[dict], migrated_only: bool = False
+) -> Optional[float]:
+    """Apply progress updates to the goal document with a single atomic update"""
+    query = {"user_id": user_id, "id": goal_id, **existing_steps_filter(updates)}
+    if migrated_only:
+        query["progress_embedded"] = True
+    goal = await goals_collection.find_one_and_update(
+        query,
+        embedded_progress_pipeline(updates),
+        projection={"progress_percentage": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    return goal["progress_percentage"] if goal else None
+
+async def save_progress(user_id: str, goal_id: str, updates: List[dict]) -> float:
+    """Persist step progress updates for a goal and return the new percentage"""
+    if PROGRESS_STORAGE == "embedded":
+        new_percentage = await write_embedded_progress(user_id, goal_id, updates)
+        if new_percentage is None:
+            raise await progress_target_error(user_id, goal_id)
+        return new_percentage
+    
+    # Progress rows may only be written for existing steps of goals in the working set
+    goal_query = {"user_id": user_id, "id": goal_id, **existing_steps_filter(updates)}
+    if not await goals_collection.count_documents(goal_query, limit=1):
+        raise await progress_target_error(user_id, goal_id)
+    if len(updates) == 1:
+        await progress_collection.update_one(
+            *progress_upsert(user_id, goal_id, updates[0]), upsert=True
+        )
+    else:
+        await progress_collection.bulk_write(
+            [UpdateOne(*progress_upsert(user_id, goal_id, data), upsert=True) for data in updates],
+            ordered=False
+        )
+    new_percentage = await refresh_goal_percentage(user_id, goal_id)
+    if new_percentage is None:
+        # The goal was archived or deleted while the rows were being written
+        raise HTTPException(status_code=404, detail="Hedef bulunamadı")
+    
+    if PROGRESS_STORAGE == "migrating":
+        # Goals that are already backfilled get the same change inline
+        await write_embedded_progress(user_id, goal_id, updates, migrated_only=True)
+    return new_percentage
+
+async def backfill_embedded_progress(goals, progress, batch_size: int) -> tuple:
+    """One pass over a tier in _id order; returns (migrated, goals_to_retry)"""
+    migrated = 0
+    retry = 0
+    last_id = None
+    while True:
+        query = {"progress_embedded": {"$ne": True}}
+        if last_id is not None:
+            # Resume after the previous batch instead of rescanning migrated goals
+            query["_id"] = {"$gt": last_id}
+        batch = await goals.find(
+            query,
+            {"id": 1, "user_id": 1, "steps": 1, "updated_at": 1}
+        ).sort("_id", ASCENDING).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            return migrated, retry
+        last_id = batch[-1]["_id"]
+        
+        goal_ids_by_user = {}
+        for goal in batch:
+            goal_ids_by_user.setdefault(goal.get("user_id"), []).append(goal["id"])
+        rows_by_goal = {}
+        async for row in progress.find({"$or": [
+            {"user_id": user_id, "goal_id": {"$in": goal_ids}}
+            for user_id, goal_ids in goal_ids_by_user.items()
+        ]}):
+            rows_by_goal.setdefault((row.get("user_id"), row["goal_id"]), []).append(row)
+        
+        ops = []
+        for goal in batch:
+            step_progress = []
+            step_count = len(goal.get("steps") or [])
+            for row in rows_by_goal.get((goal.get("user_id"), goal["id"]), []):
+                step_index = row["step_index"]
+                if not 0 <= step_index < step_count:
+                    # Legacy rows for steps that no longer exist are left behind
+                    continue
+                step_progress.extend([None] * (step_index + 1 - len(step_progress)))
+                step_progress[step_index] = {**embedded_progress_entry(row), "id": row.get("id")}
+            ops.append(UpdateOne(
+                {"_id": goal["_id"], "updated_at": goal.get("updated_at")},
+                {"$set": {"step_progress": step_progress, "progress_embedded": True}}
+            ))
+        result = await goals.bulk_write(ops, ordered=False)
+        migrated += result.modified_count
+        retry += len(ops) - result.matched_count
+        logger.info(f"Embedded progress for {migrated} goals so far")
+
+async def migrate_progress_to_embedded(batch_size: int = PROGRESS_MIGRATION_BATCH_SIZE) -> int:
+    """Backfill step_progress from the progress collections, in batches.
+
+    Meant to run while the server is in "migrating" mode. A goal is only
+    marked as migrated if its updated_at did not change while its rows
+    were being read; otherwise it is picked up again by another pass.
+    """
+    migrated = 0
+    tiers = (
+        (goals_collection, progress_collection),
+        (goals_archive_collection, progress_archive_collection)
+    )
+    for goals, progress in tiers:
+        while True:
+            tier_migrated, retry = await backfill_embedded_progress(goals, progress, batch_size)
+            migrated += tier_migrated
+            if not retry:
+                break
+    return migrated
+
+class ProgressWriteCoalescer:
+    """Buffers progress updates per goal and flushes them in one bulk write.
+
+    Every caller awaits the percentage computed after the flush that
+    contains its update. Later updates to the same step within a window
+    replace earlier ones.
+    """
+
+    def __init__(self, window_ms: int):
+        self.window = window_ms / 1000
+        self._pending = {}  # (user_id, goal_id) -> {step_index: progress_data}
+        self._waiters = {}  # (user_id, goal_id) -> [Future]
+        self._timers = {}  # (user_id, goal_id) -> Task
+        self._locks = {}  # (user_id, goal_id) -> [Lock, users], keeps flushes of a goal ordered
+
+    async def submit(self, user_id: str, goal_id: str, progress_data: dict) -> float:
+        key = (user_id, goal_id)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(key, {})[progress_data["step_index"]] = progress_data
+        self._waiters.setdefault(key, []).append(future)
+        if key not in self._timers:
+            self._timers[key] = asyncio.create_task(self._flush_later(key))
+        return await future
+
+    async def _flush_later(self, key: tuple):
+        await asyncio.sleep(self.window)
+        await self.flush(key)
+
+    async def flush(self, key: tuple):
+        """Write out everything buffered for a goal and resolve its callers"""
+        user_id, goal_id = key
+        timer = self._timers.pop(key, None)
+        if timer and timer is not asyncio.current_task():
+            timer.cancel()
+        updates = self._pending.pop(key, {})
+        waiters = self._waiters.pop(key, [])
+        if not waiters:
+            return
+
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                new_percentage = await save_progress(user_id, goal_id, list(updates.values()))
+        except Exception as e:
+            logger.error(f"Progress flush failed for goal {goal_id}: {e}")
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+            return
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._locks.pop(key, None)
+
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(new_percentage)
+
+    async def flush_all(self):
+        """Flush every buffered goal, used on shutdown"""
+        await asyncio.gather(*(self.flush(key) for key in list(self._waiters)))
+
+PROGRESS_KEY = ("user_id", "goal_id", "step_index")
+
+async def move_documents(
+    source, target, query: dict,
+    mark: Optional[dict] = None, unset: Optional[str] = None, key: tuple = ("_id",),
+    version_field: Optional[str] = None
+) -> List[dict]:
+    """Copy matching documents to another collection, then delete them from the source.
+
+    Copies are idempotent upserts on `key`, so a move interrupted between
+    the two steps can simply be run again. Documents that stopped matching
+    `query`, or whose `version_field` changed since they were read, stay in
+    the source and their copies are removed again. Returns the documents
+    that were moved.
+    """
+    docs = await source.find(query).to_list(length=None)
+    if not docs:
+        return []
+    ids = [doc["_id"] for doc in docs]
+    versions = {doc["_id"]: doc.get(version_field) for doc in docs} if version_field else {}
+    ops = []
+    for doc in docs:
+        if mark:
+            doc.update(mark)
+        if unset:
+            doc.pop(unset, None)
+        replacement = doc if key == ("_id",) else {k: v for k, v in doc.items() if k != "_id"}
+        ops.append(ReplaceOne({k: doc[k] for k in key}, replacement, upsert=True))
+    await target.bulk_write(ops, ordered=False)
+    
+    if version_field:
+        # Optimistic check: a write that landed after the read keeps the document hot
+        await source.bulk_write(
+            [DeleteOne({**query, "_id": doc_id, version_field: version}) for doc_id, version in versions.items()],
+            ordered=False
+        )
+    else:
+        await source.delete_many({**query, "_id": {"$in": ids}})
+    kept_ids = {kept["_id"] async for kept in source.find({"_id": {"$in": ids}}, {"_id": 1})}
+    if kept_ids:
+        await target.bulk_write(
+            [DeleteOne({k: doc[k] for k in key}) for doc in docs if doc["_id"] in kept_ids],
+            ordered=False
+        )
+    return [doc for doc in docs if doc["_id"] not in kept_ids]
+
+async def archive_completed_goals(user_id: str, older_than_days: int, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Move a user's goals completed more than N days ago to the archive, in batches"""
+    cutoff = datetime.now() - timedelta(days=older_than_days)
+    # Restored goals stay hot until they are completed again
+    query = {
+        "user_id": user_id,
+        "status": "completed",
+        "completed_at": {"$lt": cutoff},
+        "restored_at": {"$exists": False}
+    }
+    archived = 0
+    while True:
+        batch = await goals_collection.find(query, {"id": 1}).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            return archived
+        goal_ids = [goal["id"] for goal in batch]
+        # Goals first, re-checking the full query so a goal reopened meanwhile stays hot.
+        # Progress writes need a hot goal, so its rows can follow safely afterwards.
+        moved = await move_documents(
+            goals_collection, goals_archive_collection,
+            {**query, "id": {"$in": goal_ids}},
+            mark={"archived_at": datetime.now()},
+            version_field="updated_at"
+        )
+        if moved:
+            await move_documents(
+                progress_collection, progress_archive_collection,
+                {"user_id": user_id, "goal_id": {"$in": [goal["id"] for goal in moved]}},
+                key=PROGRESS_KEY
+            )
+        archived += len(moved)
+
+async def archive_all_users(older_than_days: int = ARCHIVE_AFTER_DAYS) -> int:
+    """Run the archival sweep for every user, one user at a time"""
+    archived = 0
+    async for user in users_collection.find({}, {"id": 1}):
+        archived += await archive_completed_goals(user["id"], older_than_days)
+    logger.info(f"Archived {archived} goals completed more than {older_than_days} days ago")
+    return archived
+
+async def restore_archived_goal(user_id: str, goal_id: str) -> bool:
+    """Move an archived goal and its progress back to the working set"""
+    if not await goals_archive_collection.count_documents({"user_id": user_id, "id": goal_id}, limit=1):
+        return False
+    # Progress first: writes are refused until the goal itself is hot again.
+    # Keyed upserts replace any row left behind by a write that raced the archiving.
+    await move_documents(
+        progress_archive_collection, progress_collection,
+        {"user_id": user_id, "goal_id": goal_id},
+        key=PROGRESS_KEY
+    )
+    restored = await move_documents(
+        goals_archive_collection, goals_collection,
+        {"user_id": user_id, "id": goal_id},
+        mark={"restored_at": datetime.now()},
+        unset="archived_at"
+    )
+    return bool(restored)
+
+progress_coalescer = (
+    ProgressWriteCoalescer(PROGRESS_COALESCE_WINDOW_MS)
+    if PROGRESS_COALESCE_WINDOW_MS > 0 else None
+)
+
+async def remove_duplicate_progress(query: dict) -> int:
+    """Keep only the newest progress row per (user_id, goal_id, step_index).
+
+    Rows written before the unique index existed could be duplicated by
+    concurrent inserts, which would stop that index from being built.
+    """
+    pipeline = [
+        {"$match": query},
+        {"$sort": {"_id": -1}},
+        {"$group": {
+            "_id": {"user_id": "$user_id", "goal_id": "$goal_id", "step_index": "$step_index"},
+            "ids": {"$push": "$_id"}
+        }},
+        {"$match": {"ids.1": {"$exists": True}}}
+    ]
+    removed = 0
+    async for group in progress_collection.aggregate(pipeline, allowDiskUse=True):
+        result = await progress_collection.delete_many({"_id": {"$in": group["ids"][1:]}})
+        removed += result.deleted_count
+    return removed
+
+async def claim_legacy_data(email: str) -> dict:
+    """Assign documents created before authentication existed to one user"""
+    user = await users_collection.find_one({"email": email.strip().lower()})
+    if not user:
+        raise ValueError(f"No user registered with {email}")
+    
+    await remove_duplicate_progress({"user_id": None})
+    claimed = {}
+    for name, collection in (
+        ("categories", categories_collection),
+        ("goals", goals_collection),
+        ("progress", progress_collection)
+    ):
+        result = await collection.update_many({"user_id": None}, {"$set": {"user_id": user["id"]}})
+        claimed[name] = result.modified_count
+    return claimed
+
+# Lifecycle events
+@app.on_event("startup")
+async def startup_event():
+    """Create indexes; every per-user index is led by user_id"""
+    # Legacy rows have no user_id; drop their duplicates so the unique index can build
+    removed = await remove_duplicate_progress({"user_id": None})
+    if removed:
+        logger.warning(f"Removed {removed} duplicate legacy progress rows")
+    await users_collection.create_index([("email", ASCENDING)], unique=True)
+    await users_collection.create_index([("id", ASCENDING)], unique=True)
+    await categories_collection.create_index([("user_id", ASCENDING), ("id", ASCENDING)], unique=True)
+    await goals_collection.create_index([("user_id", ASCENDING), ("id", ASCENDING)], unique=True)
+    await goals_collection.create_index([("user_id", ASCENDING), ("created_at", DESCENDING)])
+    await goals_collection.create_index([("user_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING)])
+    await goals_collection.create_index([("user_id", ASCENDING), ("category_id", ASCENDING), ("created_at", DESCENDING)])
+    await goals_collection.create_index([("user_id", ASCENDING), ("status", ASCENDING), ("completed_at", ASCENDING)])
+    await progress_collection.create_index(
+        [("user_id", ASCENDING), ("goal_id", ASCENDING), ("step_index", ASCENDING)],
+        unique=True
+    )
+    await goals_archive_collection.create_index([("user_id", ASCENDING), ("id", ASCENDING)], unique=True)
+    await goals_archive_collection.create_index([("user_id", ASCENDING), ("created_at", DESCENDING)])
+    await goals_archive_collection.create_index([("user_id", ASCENDING), ("category_id", ASCENDING), ("created_at", DESCENDING)])
+    await progress_archive_collection.create_index(
+        [("user_id", ASCENDING), ("goal_id", ASCENDING), ("step_index", ASCENDING)],
+        unique=True
+    )
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush buffered progress writes before the process exits"""
+    if progress_coalescer:
+        await progress_coalescer.flush_all()
+    password_executor.shutdown(wait=False)
+    client.close()
+
 # API Routes
 
 @app.get("/api/health")
@@ -142,52 +712,132 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "timestamp": datetime.now()}
 
+# Auth endpoints
+@app.post("/api/auth/register", response_model=dict)
+async def register(user: UserRegisterModel):
+    """Create an account and return an access token"""
+    user_dict = {
+        "id": str(uuid.uuid4()),
+        "email": user.email.strip().lower(),
+        "name": user.name,
+        "password_hash": await hash_password(user.password),
+        "created_at": datetime.now()
+    }
+    try:
+        await users_collection.insert_one(user_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Bu e-posta adresi zaten kayıtlı")
+    return {
+        "access_token": create_access_token(user_dict["id"]),
+        "token_type": "bearer",
+        "user": user_helper(user_dict)
+    }
+
+@app.post("/api/auth/login", response_model=dict)
+async def login(credentials: UserLoginModel):
+    """Exchange email and password for an access token"""
+    user = await users_collection.find_one({"email": credentials.email.strip().lower()})
+    password_hash = user["password_hash"] if user else DUMMY_PASSWORD_HASH
+    # Always run bcrypt so response time does not reveal whether the email exists
+    password_ok = await verify_password(credentials.password, password_hash)
+    if not user or not password_ok:
+        raise HTTPException(status_code=401, detail="E-posta veya şifre hatalı")
+    return {
+        "access_token": create_access_token(user["id"]),
+        "token_type": "bearer",
+        "user": user_helper(user)
+    }
+
+@app.get("/api/auth/me", response_model=dict)
+async def get_me(user_id: str = Depends(get_current_user_id)):
+    """Get the current user"""
+    user = await users_collection.find_one({"id": user_id})
+    if user:
+        return user_helper(user)
+    raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+
 # Categories endpoints
 @app.get("/api/categories", response_model=List[dict])
-async def get_categories():
+async def get_categories(user_id: str = Depends(get_current_user_id)):
     """Get all categories"""
     categories = []
-    async for category in categories_collection.find():
+    async for category in categories_collection.find({"user_id": user_id}):
         categories.append(category_helper(category))
     return categories
 
 @app.post("/api/categories", response_model=dict)
-async def create_category(category: CategoryModel):
+async def create_category(category: CategoryModel, user_id: str = Depends(get_current_user_id)):
     """Create a new category"""
     category_dict = category.dict()
+    category_dict["user_id"] = user_id
     result = await categories_collection.insert_one(category_dict)
     if result.inserted_id:
         return category_helper(category_dict)
     raise HTTPException(status_code=400, detail="Kategori oluşturulamadı")
 
 @app.delete("/api/categories/{category_id}")
-async def delete_category(category_id: str):
+async def delete_category(category_id: str, user_id: str = Depends(get_current_user_id)):
     """Delete a category"""
-    result = await categories_collection.delete_one({"id": category_id})
+    result = await categories_collection.delete_one({"user_id": user_id, "id": category_id})
     if result.deleted_count:
         return {"message": "Kategori başarıyla silindi"}
     raise HTTPException(status_code=404, detail="Kategori bulunamadı")
 
 # Goals endpoints
 @app.get("/api/goals", response_model=List[dict])
-async def get_goals(category_id: Optional[str] = None, status: Optional[str] = None):
-    """Get all goals with optional filtering"""
-    query = {}
+async def get_goals(
+    category_id: Optional[str] = None,
+    status: Optional[str] = None,
+    include_archived: bool = False,
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Get all goals with optional filtering and paging"""
+    query = {"user_id": user_id}
     if category_id:
         query["category_id"] = category_id
     if status:
         query["status"] = status
     
-    goals = []
-    async for goal in goals_collection.find(query).sort("created_at", -1):
-        goals.append(goal_helper(goal))
-    return goals
+    # The archive only holds completed goals, so it is read only when asked for them
+    if include_archived and status in (None, "completed"):
+        # Each tier may supply the whole page, so read skip + limit from both and merge
+        window = skip + limit if limit else 0
+        archive_query = {k: v for k, v in query.items() if k != "status"}
+        goals, archived = await asyncio.gather(
+            goals_collection.find(query).sort("created_at", -1).limit(window).to_list(length=None),
+            goals_archive_collection.find(archive_query).sort("created_at", -1).limit(window).to_list(length=None)
+        )
+        goals = sorted(goals + archived, key=lambda goal: goal["created_at"], reverse=True)
+        goals = goals[skip:skip + limit] if limit else goals[skip:]
+    else:
+        cursor = goals_collection.find(query).sort("created_at", -1).skip(skip)
+        if limit:
+            cursor = cursor.limit(limit)
+        goals = await cursor.to_list(length=None)
+    
+    return [goal_helper(goal) for goal in goals]
+
+@app.post("/api/goals/archive")
+async def archive_goals(
+    older_than_days: int = Query(ARCHIVE_AFTER_DAYS, ge=0),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Move goals completed more than N days ago to the archive"""
+    archived = await archive_completed_goals(user_id, older_than_days)
+    return {"message": f"{archived} hedef arşivlendi", "archived_count": archived}
 
 @app.post("/api/goals", response_model=dict)
-async def create_goal(goal: GoalCreateModel):
+async def create_goal(goal: GoalCreateModel, user_id: str = Depends(get_current_user_id)):
     """Create a new goal"""
     goal_data = GoalModel(**goal.dict())
     goal_dict = goal_data.dict()
+    goal_dict["user_id"] = user_id
+    if PROGRESS_STORAGE != "collection":
+        # New goals have no progress rows, so they start out migrated
+        goal_dict["step_progress"] = []
+        goal_dict["progress_embedded"] = True
     
     result = await goals_collection.insert_one(goal_dict)
     if result.inserted_id:
@@ -195,71 +845,104 @@ async def create_goal(goal: GoalCreateModel):
     raise HTTPException(status_code=400, detail="Hedef oluşturulamadı")
 
 @app.get("/api/goals/{goal_id}", response_model=dict)
-async def get_goal(goal_id: str):
-    """Get a specific goal"""
-    goal = await goals_collection.find_one({"id": goal_id})
+async def get_goal(goal_id: str, user_id: str = Depends(get_current_user_id)):
+    """Get a specific goal, from the archive tier if it was archived"""
+    query = {"user_id": user_id, "id": goal_id}
+    goal = await goals_collection.find_one(query) or await goals_archive_collection.find_one(query)
     if goal:
         return goal_helper(goal)
     raise HTTPException(status_code=404, detail="Hedef bulunamadı")
 
 @app.put("/api/goals/{goal_id}", response_model=dict)
-async def update_goal(goal_id: str, goal_update: GoalUpdateModel):
+async def update_goal(
+    goal_id: str,
+    goal_update: GoalUpdateModel,
+    user_id: str = Depends(get_current_user_id)
+):
     """Update a goal"""
     update_data = {k: v for k, v in goal_update.dict().items() if v is not None}
     update_data["updated_at"] = datetime.now()
     
+    update = {"$set": update_data}
+    
     # If status is being set to completed, set completed_at
     if update_data.get("status") == "completed":
         update_data["completed_at"] = datetime.now()
         update_data["progress_percentage"] = 100.0
+        # A restored goal that is completed again ages into the archive normally
+        update["$unset"] = {"restored_at": ""}
     
     result = await goals_collection.update_one(
-        {"id": goal_id},
-        {"$set": update_data}
+        {"user_id": user_id, "id": goal_id},
+        update
     )
     
     if result.matched_count:
-        goal = await goals_collection.find_one({"id": goal_id})
+        goal = await goals_collection.find_one({"user_id": user_id, "id": goal_id})
         return goal_helper(goal)
     raise HTTPException(status_code=404, detail="Hedef bulunamadı")
 
 @app.delete("/api/goals/{goal_id}")
-async def delete_goal(goal_id: str):
+async def delete_goal(goal_id: str, user_id: str = Depends(get_current_user_id)):
     """Delete a goal"""
     # Also delete associated progress records
-    await progress_collection.delete_many({"goal_id": goal_id})
+    await progress_collection.delete_many({"user_id": user_id, "goal_id": goal_id})
     
-    result = await goals_collection.delete_one({"id": goal_id})
+    result = await goals_collection.delete_one({"user_id": user_id, "id": goal_id})
+    if not result.deleted_count:
+        # The goal may live in the archive tier
+        await progress_archive_collection.delete_many({"user_id": user_id, "goal_id": goal_id})
+        result = await goals_archive_collection.delete_one({"user_id": user_id, "id": goal_id})
     if result.deleted_count:
         return {"message": "Hedef başarıyla silindi"}
     raise HTTPException(status_code=404, detail="Hedef bulunamadı")
 
+@app.post("/api/goals/{goal_id}/restore", response_model=dict)
+async def restore_goal(goal_id: str, user_id: str = Depends(get_current_user_id)):
+    """Restore an archived goal to the working set"""
+    if await restore_archived_goal(user_id, goal_id):
+        goal = await goals_collection.find_one({"user_id": user_id, "id": goal_id})
+        return goal_helper(goal)
+    raise HTTPException(status_code=404, detail="Arşivlenmiş hedef bulunamadı")
+
 # Progress tracking endpoints
 @app.get("/api/goals/{goal_id}/progress", response_model=List[dict])
-async def get_goal_progress(goal_id: str):
-    """Get progress for a specific goal"""
-    progress_list = []
-    async for progress in progress_collection.find({"goal_id": goal_id}).sort("step_index", 1):
-        progress_list.append({
-            "id": progress["id"],
-            "goal_id": progress["goal_id"],
-            "step_index": progress["step_index"],
-            "completed": progress["completed"],
-            "completed_at": progress.get("completed_at"),
-            "notes": progress.get("notes")
-        })
+async def get_goal_progress(goal_id: str, user_id: str = Depends(get_current_user_id)):
+    """Get progress for a specific goal, from the archive tier if it was archived"""
+    goal_query = {"user_id": user_id, "id": goal_id}
+    if PROGRESS_STORAGE != "collection":
+        projection = {"id": 1, "step_progress": 1, "progress_embedded": 1}
+        goal = (
+            await goals_collection.find_one(goal_query, projection)
+            or await goals_archive_collection.find_one(goal_query, projection)
+        )
+        if PROGRESS_STORAGE == "embedded":
+            return embedded_progress_list(goal) if goal else []
+        if goal and goal.get("progress_embedded"):
+            return embedded_progress_list(goal)
+    
+    query = {"user_id": user_id, "goal_id": goal_id}
+    progress_list = [
+        progress_helper(progress)
+        async for progress in progress_collection.find(query).sort("step_index", 1)
+    ]
+    # Rows of an archived goal live in the archive tier
+    if not progress_list and await goals_archive_collection.count_documents(goal_query, limit=1):
+        progress_list = [
+            progress_helper(progress)
+            async for progress in progress_archive_collection.find(query).sort("step_index", 1)
+        ]
     return progress_list
 
 @app.post("/api/goals/{goal_id}/progress", response_model=dict)
-async def update_step_progress(goal_id: str, progress_update: ProgressUpdateModel):
+async def update_step_progress(
+    goal_id: str,
+    progress_update: ProgressUpdateModel,
+    user_id: str = Depends(get_current_user_id)
+):
     """Update progress for a specific step"""
-    # Check if progress record exists
-    existing_progress = await progress_collection.find_one({
-        "goal_id": goal_id,
-        "step_index": progress_update.step_index
-    })
-    
     progress_data = {
+        "user_id": user_id,
         "goal_id": goal_id,
         "step_index": progress_update.step_index,
         "completed": progress_update.completed,
@@ -271,41 +954,91 @@ async def update_step_progress(goal_id: str, progress_update: ProgressUpdateMode
     else:
         progress_data["completed_at"] = None
     
-    if existing_progress:
-        # Update existing progress
-        await progress_collection.update_one(
-            {"goal_id": goal_id, "step_index": progress_update.step_index},
-            {"$set": progress_data}
-        )
+    if progress_coalescer:
+        # Validate up front so one bad step cannot fail a whole coalesced batch
+        goal = await goals_collection.find_one({"user_id": user_id, "id": goal_id}, {"steps": 1})
+        if not goal:
+            raise HTTPException(status_code=404, detail="Hedef bulunamadı")
+        if progress_update.step_index >= len(goal.get("steps", [])):
+            raise HTTPException(status_code=400, detail="Geçersiz adım numarası")
+        # Rapid toggles on the same goal are merged into one bulk write
+        new_percentage = await progress_coalescer.submit(user_id, goal_id, progress_data)
     else:
-        # Create new progress record
-        progress_data["id"] = str(uuid.uuid4())
-        await progress_collection.insert_one(progress_data)
-    
-    # Update goal progress percentage
-    new_percentage = await calculate_progress_percentage(goal_id)
-    await goals_collection.update_one(
-        {"id": goal_id},
-        {"$set": {"progress_percentage": new_percentage, "updated_at": datetime.now()}}
-    )
+        new_percentage = await save_progress(user_id, goal_id, [progress_data])
     
     return {"message": "İlerleme başarıyla güncellendi", "progress_percentage": new_percentage}
 
 # Statistics endpoint
 @app.get("/api/stats")
-async def get_stats():
+async def get_stats(user_id: str = Depends(get_current_user_id)):
     """Get statistics"""
-    total_goals = await goals_collection.count_documents({})
-    completed_goals = await goals_collection.count_documents({"status": "completed"})
-    active_goals = await goals_collection.count_documents({"status": "active"})
+    total_goals = await goals_collection.count_documents({"user_id": user_id})
+    completed_goals = await goals_collection.count_documents({"user_id": user_id, "status": "completed"})
+    active_goals = await goals_collection.count_documents({"user_id": user_id, "status": "active"})
+    archived_goals = await goals_archive_collection.count_documents({"user_id": user_id})
+    
+    return stats_helper(total_goals, completed_goals, active_goals, archived_goals)
+
+# Dashboard endpoint
+@app.get("/api/dashboard")
+async def get_dashboard(
+    category_id: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Get the first page of goals, categories and stats in one request"""
+    goals_match = {"category_id": category_id} if category_id else {}
+    pipeline = [
+        {"$match": {"user_id": user_id}},
+        {"$facet": {
+            "goals": [
+                {"$match": goals_match},
+                {"$sort": {"created_at": -1}},
+                # One extra document tells us whether another page exists
+                {"$limit": limit + 1}
+            ],
+            "stats": [
+                {"$group": {
+                    "_id": None,
+                    "total": {"$sum": 1},
+                    "completed": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
+                    "active": {"$sum": {"$cond": [{"$eq": ["$status", "active"]}, 1, 0]}}
+                }}
+            ]
+        }}
+    ]
+    
+    facet_results, categories, archived_goals = await asyncio.gather(
+        goals_collection.aggregate(pipeline).to_list(length=1),
+        categories_collection.find({"user_id": user_id}).to_list(length=None),
+        goals_archive_collection.count_documents({"user_id": user_id})
+    )
+    facets = facet_results[0] if facet_results else {"goals": [], "stats": []}
+    counts = facets["stats"][0] if facets["stats"] else {"total": 0, "completed": 0, "active": 0}
+    goals = facets["goals"]
     
     return {
-        "total_goals": total_goals,
-        "completed_goals": completed_goals,
-        "active_goals": active_goals,
-        "completion_rate": (completed_goals / total_goals * 100) if total_goals > 0 else 0
+        "goals": [goal_helper(goal) for goal in goals[:limit]],
+        "has_more": len(goals) > limit,
+        "categories": [category_helper(category) for category in categories],
+        "stats": stats_helper(counts["total"], counts["completed"], counts["active"], archived_goals)
     }
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
+    import sys
+    if len(sys.argv) == 3 and sys.argv[1] == "claim-legacy-data":
+        # Data created before authentication stays hidden until it is given an owner
+        claimed_counts = asyncio.run(claim_legacy_data(sys.argv[2]))
+        logger.info(f"Legacy data claimed: {claimed_counts}")
+    elif sys.argv[1:] == ["archive-goals"]:
+        # Meant to be scheduled (e.g. daily cron) to keep the working set small
+        asyncio.run(archive_all_users())
+    elif sys.argv[1:] == ["migrate-progress"]:
+        # Run with PROGRESS_STORAGE=migrating on the servers, then switch them to embedded
+        if PROGRESS_STORAGE == "collection":
+            sys.exit("Set PROGRESS_STORAGE=migrating before backfilling embedded progress")
+        migrated_count = asyncio.run(migrate_progress_to_embedded())
+        logger.info(f"Progress migration finished, {migrated_count} goals migrated")
+    else:
+        import uvicorn
+        uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
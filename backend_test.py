@@ -6,7 +6,12 @@ Tests all FastAPI endpoints with realistic data
 
 import requests
 import json
+import os
+import subprocess
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Dict, List, Optional
 
@@ -14,6 +19,33 @@ from typing import Dict, List, Optional
 BACKEND_URL = "http://localhost:8001"
 API_BASE = f"{BACKEND_URL}/api"
 
+# Extra servers with non-default settings are started from here
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+
+@contextmanager
+def spawned_server(port: int, **env):
+    """Run a second backend process with extra environment settings"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    api_base = f"http://localhost:{port}/api"
+    try:
+        for _ in range(50):
+            try:
+                if requests.get(f"{api_base}/health").status_code == 200:
+                    break
+            except requests.ConnectionError:
+                pass
+            time.sleep(0.2)
+        yield api_base
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
 class BackendTester:
     def __init__(self):
         self.session = requests.Session()
@@ -55,6 +87,62 @@ class BackendTester:
             self.log_test("Health Check", False, f"Connection error: {str(e)}")
             return False
     
+    def test_authentication(self):
+        """Test registration, login and token enforcement"""
+        success_count = 0
+        credentials = {
+            "email": f"test-{int(time.time() * 1000)}@example.com",
+            "password": "guclu-sifre-123"
+        }
+        
+        # Test protected endpoint without a token
+        try:
+            response = self.session.get(f"{API_BASE}/goals")
+            if response.status_code in [401, 403]:
+                self.log_test("Auth: Missing Token", True, f"Correctly rejected request with {response.status_code}")
+                success_count += 1
+            else:
+                self.log_test("Auth: Missing Token", False, f"Expected 401/403, got {response.status_code}")
+        except Exception as e:
+            self.log_test("Auth: Missing Token", False, f"Error: {str(e)}")
+        
+        # Test REGISTER
+        try:
+            response = self.session.post(f"{API_BASE}/auth/register", json={**credentials, "name": "Test Kullanıcı"})
+            if response.status_code == 200 and "access_token" in response.json():
+                self.log_test("Auth: Register", True, "User registered successfully", response.json()["user"])
+                success_count += 1
+            else:
+                self.log_test("Auth: Register", False, f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_test("Auth: Register", False, f"Error: {str(e)}")
+        
+        # Test LOGIN and use the token for the remaining tests
+        try:
+            response = self.session.post(f"{API_BASE}/auth/login", json=credentials)
+            if response.status_code == 200 and "access_token" in response.json():
+                token = response.json()["access_token"]
+                self.session.headers["Authorization"] = f"Bearer {token}"
+                self.log_test("Auth: Login", True, "Logged in successfully")
+                success_count += 1
+            else:
+                self.log_test("Auth: Login", False, f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_test("Auth: Login", False, f"Error: {str(e)}")
+        
+        # Test wrong password
+        try:
+            response = self.session.post(f"{API_BASE}/auth/login", json={**credentials, "password": "yanlis-sifre"})
+            if response.status_code == 401:
+                self.log_test("Auth: Wrong Password", True, "Correctly rejected wrong password")
+                success_count += 1
+            else:
+                self.log_test("Auth: Wrong Password", False, f"Expected 401, got {response.status_code}")
+        except Exception as e:
+            self.log_test("Auth: Wrong Password", False, f"Error: {str(e)}")
+        
+        return success_count >= 3 and "Authorization" in self.session.headers
+    
     def test_categories_crud(self):
         """Test Categories CRUD operations"""
         success_count = 0
@@ -295,7 +383,7 @@ class BackendTester:
         except Exception as e:
             self.log_test("Get Goal Progress (After Updates)", False, f"Error: {str(e)}")
         
-        return success_count >= 4  # At least 4 out of 5 tests should pass
+        return success_count >= 5  # At least 5 out of 6 tests should pass
     
     def test_statistics(self):
         """Test Statistics endpoint"""
@@ -317,6 +405,234 @@ class BackendTester:
             self.log_test("Get Statistics", False, f"Error: {str(e)}")
             return False
     
+    def test_archiving(self):
+        """Test archiving completed goals and restoring them"""
+        if not self.created_goals:
+            self.log_test("Archiving", False, "No goals available for archive testing")
+            return False
+        
+        # The first goal has steps and progress from the progress tracking tests
+        goal_id = self.created_goals[0]["id"]
+        success_count = 0
+        try:
+            stats_before = self.session.get(f"{API_BASE}/stats").json()
+            self.session.put(f"{API_BASE}/goals/{goal_id}", json={"status": "completed"})
+            response = self.session.post(f"{API_BASE}/goals/archive?older_than_days=0")
+            if response.status_code == 200 and response.json().get("archived_count", 0) >= 1:
+                self.log_test("Archive Completed Goals", True, response.json()["message"], response.json())
+                success_count += 1
+            else:
+                self.log_test("Archive Completed Goals", False, f"HTTP {response.status_code}: {response.text}")
+            
+            hot_ids = [g["id"] for g in self.session.get(f"{API_BASE}/goals?status=completed").json()]
+            all_ids = [g["id"] for g in self.session.get(f"{API_BASE}/goals?status=completed&include_archived=true").json()]
+            if goal_id not in hot_ids and goal_id in all_ids:
+                self.log_test("Get Goals (Include Archived)", True, "Archived goal only returned when requested")
+                success_count += 1
+            else:
+                self.log_test("Get Goals (Include Archived)", False, "Archived goal visibility is wrong", {"hot": hot_ids, "all": all_ids})
+            
+            archived_goal = self.session.get(f"{API_BASE}/goals/{goal_id}")
+            archived_progress = self.session.get(f"{API_BASE}/goals/{goal_id}/progress").json()
+            if archived_goal.status_code == 200 and archived_goal.json()["archived"] and archived_progress:
+                self.log_test("Get Archived Goal", True, "Archived goal and its progress are readable", {"progress": len(archived_progress)})
+                success_count += 1
+            else:
+                self.log_test("Get Archived Goal", False, f"HTTP {archived_goal.status_code}: {archived_goal.text}", {"progress": archived_progress})
+            
+            stats_after = self.session.get(f"{API_BASE}/stats").json()
+            if stats_after["total_goals"] == stats_before["total_goals"]:
+                self.log_test("Statistics Across Tiers", True, "Total goal count unchanged by archiving", stats_after)
+                success_count += 1
+            else:
+                self.log_test("Statistics Across Tiers", False, "Total goal count changed", {"before": stats_before, "after": stats_after})
+            
+            response = self.session.post(f"{API_BASE}/goals/{goal_id}/restore")
+            if response.status_code == 200 and not response.json()["archived"]:
+                self.log_test("Restore Archived Goal", True, "Goal restored to working set", response.json())
+                success_count += 1
+            else:
+                self.log_test("Restore Archived Goal", False, f"HTTP {response.status_code}: {response.text}")
+            
+            # A restored goal must survive the next archive sweep
+            self.session.post(f"{API_BASE}/goals/archive?older_than_days=0")
+            hot_ids = [g["id"] for g in self.session.get(f"{API_BASE}/goals?status=completed").json()]
+            if goal_id in hot_ids:
+                self.log_test("Restored Goal Stays Hot", True, "Archive sweep skipped the restored goal")
+                success_count += 1
+            else:
+                self.log_test("Restored Goal Stays Hot", False, "Restored goal was archived again", {"hot": hot_ids})
+        except Exception as e:
+            self.log_test("Archiving", False, f"Error: {str(e)}")
+        
+        return success_count >= 5  # At least 5 out of 6 tests should pass
+    
+    def test_dashboard(self):
+        """Test combined dashboard endpoint"""
+        try:
+            response = self.session.get(f"{API_BASE}/dashboard")
+            stats_response = self.session.get(f"{API_BASE}/stats")
+            if response.status_code == 200:
+                dashboard = response.json()
+                required_fields = ["goals", "has_more", "categories", "stats"]
+                if not all(field in dashboard for field in required_fields):
+                    self.log_test("Get Dashboard", False, "Missing required fields in dashboard", dashboard)
+                    return False
+                if dashboard["stats"] != stats_response.json():
+                    self.log_test("Get Dashboard", False, "Dashboard stats differ from /stats", dashboard["stats"])
+                    return False
+                self.log_test("Get Dashboard", True, f"Retrieved {len(dashboard['goals'])} goals and {len(dashboard['categories'])} categories", dashboard["stats"])
+                return True
+            else:
+                self.log_test("Get Dashboard", False, f"HTTP {response.status_code}: {response.text}")
+                return False
+        except Exception as e:
+            self.log_test("Get Dashboard", False, f"Error: {str(e)}")
+            return False
+    
+    def new_user_session(self, api_base: str) -> requests.Session:
+        """Register a fresh user and return a session carrying its token"""
+        session = requests.Session()
+        response = session.post(f"{api_base}/auth/register", json={
+            "email": f"test-{time.time_ns()}@example.com",
+            "password": "guclu-sifre-123"
+        })
+        response.raise_for_status()
+        session.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        return session
+    
+    def create_goal_with_steps(self, session: requests.Session, api_base: str, step_count: int) -> str:
+        """Create a goal with the given number of steps and return its id"""
+        goal = session.post(f"{api_base}/goals", json={"description": "Adım testi hedefi"}).json()
+        steps = [f"Adım {i + 1}" for i in range(step_count)]
+        session.put(f"{api_base}/goals/{goal['id']}", json={"steps": steps}).raise_for_status()
+        return goal["id"]
+    
+    def test_progress_coalescing(self):
+        """Test concurrent progress writes with write coalescing enabled"""
+        try:
+            with spawned_server(8002, PROGRESS_COALESCE_WINDOW_MS="200") as api_base:
+                session = self.new_user_session(api_base)
+                goal_id = self.create_goal_with_steps(session, api_base, 5)
+                
+                def toggle(step_index):
+                    return requests.post(
+                        f"{api_base}/goals/{goal_id}/progress",
+                        json={"step_index": step_index, "completed": True},
+                        headers=session.headers
+                    )
+                
+                with ThreadPoolExecutor(max_workers=5) as pool:
+                    responses = list(pool.map(toggle, range(5)))
+                
+                percentages = {r.json().get("progress_percentage") for r in responses if r.status_code == 200}
+                progress_list = session.get(f"{api_base}/goals/{goal_id}/progress").json()
+                goal = session.get(f"{api_base}/goals/{goal_id}").json()
+                session.delete(f"{api_base}/goals/{goal_id}")
+            
+            stored_steps = sorted(p["step_index"] for p in progress_list if p["completed"])
+            if (all(r.status_code == 200 for r in responses) and percentages == {100.0}
+                    and stored_steps == list(range(5)) and goal["progress_percentage"] == 100.0):
+                self.log_test("Coalesced Progress Writes", True, "Concurrent updates flushed together with one final percentage")
+                return True
+            self.log_test("Coalesced Progress Writes", False, "Coalesced writes are inconsistent", {
+                "statuses": [r.status_code for r in responses],
+                "percentages": sorted(percentages),
+                "stored_steps": stored_steps
+            })
+            return False
+        except Exception as e:
+            self.log_test("Coalesced Progress Writes", False, f"Error: {str(e)}")
+            return False
+    
+    def test_embedded_progress(self):
+        """Test progress round-trip with progress stored on the goal document"""
+        success_count = 0
+        try:
+            with spawned_server(8003, PROGRESS_STORAGE="embedded") as api_base:
+                session = self.new_user_session(api_base)
+                goal_id = self.create_goal_with_steps(session, api_base, 3)
+                progress_url = f"{api_base}/goals/{goal_id}/progress"
+                
+                # Notes starting with "$" must be stored literally by the update pipeline
+                first = session.post(progress_url, json={"step_index": 0, "completed": True, "notes": "$ilk adım"})
+                first_progress = session.get(progress_url).json()
+                session.post(progress_url, json={"step_index": 2, "completed": True})
+                last = session.post(progress_url, json={"step_index": 0, "completed": True, "notes": "güncellendi"})
+                progress_list = session.get(progress_url).json()
+                out_of_range = session.post(progress_url, json={"step_index": 3, "completed": True})
+                negative = session.post(progress_url, json={"step_index": -1, "completed": True})
+                goal = session.get(f"{api_base}/goals/{goal_id}").json()
+                session.delete(f"{api_base}/goals/{goal_id}")
+            
+            if first.status_code == 200 and first_progress[0]["notes"] == "$ilk adım":
+                self.log_test("Embedded Progress: Write", True, "Step progress stored on the goal", first.json())
+                success_count += 1
+            else:
+                self.log_test("Embedded Progress: Write", False, f"HTTP {first.status_code}: {first.text}", {"progress": first_progress})
+            
+            if ([p["step_index"] for p in progress_list] == [0, 2]
+                    and progress_list[0]["id"] == first_progress[0]["id"]
+                    and progress_list[0]["notes"] == "güncellendi"
+                    and round(last.json()["progress_percentage"], 2) == 66.67
+                    and round(goal["progress_percentage"], 2) == 66.67):
+                self.log_test("Embedded Progress: Round-trip", True, "Response shape, ids and percentage preserved", {"progress": progress_list})
+                success_count += 1
+            else:
+                self.log_test("Embedded Progress: Round-trip", False, "Embedded progress is inconsistent", {"progress": progress_list, "goal": goal})
+            
+            if out_of_range.status_code == 400 and negative.status_code == 422:
+                self.log_test("Embedded Progress: Invalid Step", True, "Rejected out-of-range and negative step indexes")
+                success_count += 1
+            else:
+                self.log_test("Embedded Progress: Invalid Step", False, f"Expected 400/422, got {out_of_range.status_code}/{negative.status_code}")
+        except Exception as e:
+            self.log_test("Embedded Progress", False, f"Error: {str(e)}")
+        
+        return success_count == 3
+    
+    def test_progress_migration(self):
+        """Test backfilling embedded progress from the progress collection"""
+        try:
+            with spawned_server(8004, PROGRESS_STORAGE="collection") as api_base:
+                session = self.new_user_session(api_base)
+                goal_id = self.create_goal_with_steps(session, api_base, 4)
+                for step_index in (0, 1, 3):
+                    session.post(f"{api_base}/goals/{goal_id}/progress", json={"step_index": step_index, "completed": True})
+                session.post(f"{api_base}/goals/{goal_id}/progress", json={"step_index": 1, "completed": False})
+                rows_before = session.get(f"{api_base}/goals/{goal_id}/progress").json()
+            
+            migration = subprocess.run(
+                [sys.executable, "server.py", "migrate-progress"],
+                cwd=BACKEND_DIR,
+                env={**os.environ, "PROGRESS_STORAGE": "migrating"},
+                capture_output=True,
+                text=True,
+                timeout=120
+            )
+            
+            with spawned_server(8005, PROGRESS_STORAGE="embedded") as api_base:
+                rows_after = session.get(f"{api_base}/goals/{goal_id}/progress").json()
+                goal = session.get(f"{api_base}/goals/{goal_id}").json()
+                session.delete(f"{api_base}/goals/{goal_id}")
+            
+            def comparable(rows):
+                return [(r["id"], r["step_index"], r["completed"]) for r in rows]
+            
+            if migration.returncode == 0 and comparable(rows_after) == comparable(rows_before) and goal["progress_percentage"] == 50.0:
+                self.log_test("Progress Migration Backfill", True, f"Backfilled {len(rows_after)} progress rows onto the goal", {"progress": rows_after})
+                return True
+            self.log_test("Progress Migration Backfill", False, "Backfilled progress differs from the collection", {
+                "returncode": migration.returncode,
+                "stderr": migration.stderr[-500:],
+                "before": rows_before,
+                "after": rows_after
+            })
+            return False
+        except Exception as e:
+            self.log_test("Progress Migration Backfill", False, f"Error: {str(e)}")
+            return False
+    
     def test_error_handling(self):
         """Test error handling scenarios"""
         success_count = 0
@@ -389,10 +705,16 @@ class BackendTester:
         
         # Run tests in logical order
         test_results["health"] = self.test_health_check()
+        test_results["auth"] = self.test_authentication()
         test_results["categories"] = self.test_categories_crud()
         test_results["goals"] = self.test_goals_crud()
         test_results["progress"] = self.test_progress_tracking()
+        test_results["coalescing"] = self.test_progress_coalescing()
+        test_results["embedded_progress"] = self.test_embedded_progress()
+        test_results["progress_migration"] = self.test_progress_migration()
         test_results["statistics"] = self.test_statistics()
+        test_results["archiving"] = self.test_archiving()
+        test_results["dashboard"] = self.test_dashboard()
         test_results["error_handling"] = self.test_error_handling()
         
         # Summary
@@ -1,15 +1,21 @@
 import React, { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
-import { Target, CheckCircle2, BookOpen, AlertCircle, Loader2, Key, ChevronDown, ChevronRight, Filter, BarChart3 } from 'lucide-react';
+import { Target, CheckCircle2, BookOpen, AlertCircle, Loader2, Key, ChevronDown, ChevronRight, Filter, BarChart3, LogOut } from 'lucide-react';
 import ReactMarkdown from 'react-markdown';
 import remarkGfm from 'remark-gfm';
 import ApiService from './services/api';
+import AuthForm from './components/AuthForm';
 import CategoryManager from './components/CategoryManager';
 import ProgressTracker from './components/ProgressTracker';
 import './App.css';
 
+const GOALS_PAGE_SIZE = 50;
+
 function App() {
+  const [isAuthenticated, setIsAuthenticated] = useState(() => !!ApiService.getToken());
   const [goals, setGoals] = useState([]);
+  const [hasMoreGoals, setHasMoreGoals] = useState(false);
+  const [loadingMoreGoals, setLoadingMoreGoals] = useState(false);
   const [categories, setCategories] = useState([]);
   const [selectedCategoryId, setSelectedCategoryId] = useState(null);
   const [newGoal, setNewGoal] = useState('');
@@ -33,31 +39,50 @@ function App() {
   });
 
   useEffect(() => {
-    loadGoals();
-    loadCategories();
-    loadStats();
-  }, [selectedCategoryId]);
+    ApiService.onUnauthorized = () => setIsAuthenticated(false);
+    return () => {
+      ApiService.onUnauthorized = null;
+    };
+  }, []);
+
+  useEffect(() => {
+    if (!isAuthenticated) return;
+    loadDashboard();
+  }, [selectedCategoryId, isAuthenticated]);
 
   useEffect(() => {
     localStorage.setItem('collapsedGoals', JSON.stringify(collapsedGoals));
   }, [collapsedGoals]);
 
-  const loadGoals = async () => {
+  const loadDashboard = async () => {
     try {
-      const goalsData = await ApiService.getGoals(selectedCategoryId);
-      setGoals(goalsData);
+      const dashboard = await ApiService.getDashboard(selectedCategoryId, GOALS_PAGE_SIZE);
+      setGoals(dashboard.goals);
+      setHasMoreGoals(dashboard.has_more);
+      setCategories(dashboard.categories);
+      setStats(dashboard.stats);
     } catch (error) {
       showMessage('Hedefler yüklenemedi: ' + error.message, true);
     }
   };
 
-  const loadCategories = async () => {
+  const loadMoreGoals = async () => {
+    setLoadingMoreGoals(true);
     try {
-      const categoriesData = await ApiService.getCategories();
-      setCategories(categoriesData);
+      // Ask for one extra goal to find out whether another page exists
+      const page = await ApiService.getGoals(selectedCategoryId, null, false, {
+        skip: goals.length,
+        limit: GOALS_PAGE_SIZE + 1
+      });
+      setGoals(prevGoals => {
+        const knownIds = new Set(prevGoals.map(goal => goal.id));
+        return [...prevGoals, ...page.slice(0, GOALS_PAGE_SIZE).filter(goal => !knownIds.has(goal.id))];
+      });
+      setHasMoreGoals(page.length > GOALS_PAGE_SIZE);
     } catch (error) {
-      showMessage('Kategoriler yüklenemedi: ' + error.message, true);
+      showMessage('Hedefler yüklenemedi: ' + error.message, true);
     }
+    setLoadingMoreGoals(false);
   };
 
   const loadStats = async () => {
@@ -100,6 +125,14 @@ function App() {
     showMessage('API anahtarı başarıyla kaydedildi!');
   };
 
+  const logout = () => {
+    ApiService.logout();
+    setGoals([]);
+    setCategories([]);
+    setSelectedCategoryId(null);
+    setIsAuthenticated(false);
+  };
+
   const resetApiKey = () => {
     localStorage.removeItem('openai_api_key');
     setApiKey('');
@@ -255,6 +288,10 @@ Not: Vurgu için markdown formatını (*italik*) ve **kalın** metin kullanın.
     loadStats();
   };
 
+  if (!isAuthenticated) {
+    return <AuthForm onAuthenticated={() => setIsAuthenticated(true)} />;
+  }
+
   return (
     <div className="min-h-screen bg-gradient-to-br from-primary-50 via-white to-secondary-50">
       <div className="container mx-auto px-4 py-12">
@@ -375,13 +412,20 @@ Not: Vurgu için markdown formatını (*italik*) ve **kalın** metin kullanın.
               </p>
             </div>
           ) : (
-            <div className="text-right mb-4">
+            <div className="flex justify-end gap-4 mb-4">
               <button
                 onClick={resetApiKey}
                 className="text-sm text-secondary-600 hover:text-secondary-800"
               >
                 API Anahtarını Sıfırla
               </button>
+              <button
+                onClick={logout}
+                className="text-sm text-secondary-600 hover:text-secondary-800 flex items-center"
+              >
+                <LogOut className="w-4 h-4 mr-1" />
+                Çıkış Yap
+              </button>
             </div>
           )}
 
@@ -711,6 +755,22 @@ Not: Vurgu için markdown formatını (*italik*) ve **kalın** metin kullanın.
                 </motion.div>
               ))}
             </motion.div>
+
+            {hasMoreGoals && (
+              <div className="text-center mt-6">
+                <button
+                  onClick={loadMoreGoals}
+                  disabled={loadingMoreGoals}
+                  className="px-6 py-3 bg-white border-2 border-secondary-200 text-secondary-700 rounded-xl hover:border-primary-400 hover:text-primary-700 transition-all font-medium disabled:opacity-50"
+                >
+                  {loadingMoreGoals ? (
+                    <Loader2 className="w-5 h-5 animate-spin inline" />
+                  ) : (
+                    'Daha Fazla Hedef Yükle'
+                  )}
+                </button>
+              </div>
+            )}
           </div>
         </motion.div>
       </div>
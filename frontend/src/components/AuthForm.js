@@ -0,0 +1,109 @@
+import React, { useState } from 'react';
+import { motion } from 'framer-motion';
+import { Target, LogIn, UserPlus, AlertCircle, Loader2 } from 'lucide-react';
+import ApiService from '../services/api';
+
+const MIN_PASSWORD_LENGTH = 6;
+
+const AuthForm = ({ onAuthenticated }) => {
+  const [mode, setMode] = useState('login');
+  const [form, setForm] = useState({ name: '', email: '', password: '' });
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState('');
+
+  const isRegister = mode === 'register';
+
+  const handleSubmit = async (e) => {
+    e.preventDefault();
+    if (!form.email.trim() || !form.password) {
+      setError('E-posta ve şifre gerekli');
+      return;
+    }
+    if (isRegister && form.password.length < MIN_PASSWORD_LENGTH) {
+      setError(`Şifre en az ${MIN_PASSWORD_LENGTH} karakter olmalı`);
+      return;
+    }
+
+    setLoading(true);
+    setError('');
+    try {
+      const result = isRegister
+        ? await ApiService.register(form)
+        : await ApiService.login({ email: form.email, password: form.password });
+      onAuthenticated(result.user);
+    } catch (error) {
+      setError(error.message);
+    }
+    setLoading(false);
+  };
+
+  return (
+    <div className="min-h-screen bg-gradient-to-br from-primary-50 via-white to-secondary-50 flex items-center justify-center px-4">
+      <motion.div
+        initial={{ opacity: 0, y: 20 }}
+        animate={{ opacity: 1, y: 0 }}
+        className="bg-white rounded-xl shadow-soft-md p-8 w-full max-w-md"
+      >
+        <div className="flex items-center justify-center mb-6">
+          <Target className="w-10 h-10 text-primary-600 mr-3" />
+          <h1 className="text-3xl font-display font-bold text-secondary-900">AI Hedef Koçu</h1>
+        </div>
+
+        {error && (
+          <div className="mb-4 p-3 rounded-lg bg-red-50 flex items-center">
+            <AlertCircle className="w-5 h-5 text-red-500 mr-2" />
+            <p className="text-red-700 text-sm">{error}</p>
+          </div>
+        )}
+
+        <form onSubmit={handleSubmit} className="space-y-4">
+          {isRegister && (
+            <input
+              type="text"
+              value={form.name}
+              onChange={(e) => setForm({ ...form, name: e.target.value })}
+              placeholder="Adınız"
+              className="w-full px-4 py-3 rounded-lg border border-secondary-200 focus:border-primary-500 focus:ring-2 focus:ring-primary-200 outline-none"
+            />
+          )}
+          <input
+            type="email"
+            value={form.email}
+            onChange={(e) => setForm({ ...form, email: e.target.value })}
+            placeholder="E-posta"
+            className="w-full px-4 py-3 rounded-lg border border-secondary-200 focus:border-primary-500 focus:ring-2 focus:ring-primary-200 outline-none"
+          />
+          <input
+            type="password"
+            value={form.password}
+            onChange={(e) => setForm({ ...form, password: e.target.value })}
+            placeholder="Şifre"
+            className="w-full px-4 py-3 rounded-lg border border-secondary-200 focus:border-primary-500 focus:ring-2 focus:ring-primary-200 outline-none"
+          />
+          <button
+            type="submit"
+            disabled={loading}
+            className="w-full flex items-center justify-center px-4 py-3 bg-primary-600 text-white rounded-lg hover:bg-primary-700 disabled:opacity-50 transition-colors"
+          >
+            {loading ? (
+              <Loader2 className="w-5 h-5 animate-spin" />
+            ) : isRegister ? (
+              <><UserPlus className="w-5 h-5 mr-2" /> Kayıt Ol</>
+            ) : (
+              <><LogIn className="w-5 h-5 mr-2" /> Giriş Yap</>
+            )}
+          </button>
+        </form>
+
+        <button
+          onClick={() => { setMode(isRegister ? 'login' : 'register'); setError(''); }}
+          className="w-full mt-4 text-sm text-primary-600 hover:text-primary-700"
+        >
+          {isRegister ? 'Zaten hesabınız var mı? Giriş yapın' : 'Hesabınız yok mu? Kayıt olun'}
+        </button>
+      </motion.div>
+    </div>
+  );
+};
+
+export default AuthForm;
@@ -1,18 +1,34 @@
 const API_BASE_URL = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
+const TOKEN_STORAGE_KEY = 'auth_token';
 
 class ApiService {
   constructor() {
     this.baseURL = API_BASE_URL;
+    this.onUnauthorized = null;
+  }
+
+  getToken() {
+    return localStorage.getItem(TOKEN_STORAGE_KEY);
+  }
+
+  setToken(token) {
+    if (token) {
+      localStorage.setItem(TOKEN_STORAGE_KEY, token);
+    } else {
+      localStorage.removeItem(TOKEN_STORAGE_KEY);
+    }
   }
 
   async request(endpoint, options = {}) {
     const url = `${this.baseURL}${endpoint}`;
+    const token = this.getToken();
     const config = {
+      ...options,
       headers: {
         'Content-Type': 'application/json',
+        ...(token ? { Authorization: `Bearer ${token}` } : {}),
         ...options.headers,
       },
-      ...options,
     };
 
     if (config.body && typeof config.body === 'object') {
@@ -22,9 +38,18 @@ class ApiService {
     try {
       const response = await fetch(url, config);
       
+      if (response.status === 401 && token) {
+        this.setToken(null);
+        if (this.onUnauthorized) this.onUnauthorized();
+      }
+
       if (!response.ok) {
         const errorData = await response.json().catch(() => ({}));
-        throw new Error(errorData.detail || `HTTP error! status: ${response.status}`);
+        // Validation errors (422) carry a list of {loc, msg} objects
+        const detail = Array.isArray(errorData.detail)
+          ? errorData.detail.map(item => item.msg).join(', ')
+          : errorData.detail;
+        throw new Error(detail || `HTTP error! status: ${response.status}`);
       }
 
       return await response.json();
@@ -34,11 +59,41 @@ class ApiService {
     }
   }
 
+  // Auth API
+  async register(userData) {
+    const result = await this.request('/api/auth/register', {
+      method: 'POST',
+      body: userData,
+    });
+    this.setToken(result.access_token);
+    return result;
+  }
+
+  async login(credentials) {
+    const result = await this.request('/api/auth/login', {
+      method: 'POST',
+      body: credentials,
+    });
+    this.setToken(result.access_token);
+    return result;
+  }
+
+  logout() {
+    this.setToken(null);
+  }
+
+  async getCurrentUser() {
+    return this.request('/api/auth/me');
+  }
+
   // Goals API
-  async getGoals(categoryId = null, status = null) {
+  async getGoals(categoryId = null, status = null, includeArchived = false, { skip = 0, limit = null } = {}) {
     const params = new URLSearchParams();
     if (categoryId) params.append('category_id', categoryId);
     if (status) params.append('status', status);
+    if (includeArchived) params.append('include_archived', 'true');
+    if (skip) params.append('skip', skip);
+    if (limit) params.append('limit', limit);
     
     const queryString = params.toString();
     const endpoint = `/api/goals${queryString ? `?${queryString}` : ''}`;
@@ -70,6 +125,19 @@ class ApiService {
     return this.request(`/api/goals/${goalId}`);
   }
 
+  async archiveGoals(olderThanDays = null) {
+    const queryString = olderThanDays !== null ? `?older_than_days=${olderThanDays}` : '';
+    return this.request(`/api/goals/archive${queryString}`, {
+      method: 'POST',
+    });
+  }
+
+  async restoreGoal(goalId) {
+    return this.request(`/api/goals/${goalId}/restore`, {
+      method: 'POST',
+    });
+  }
+
   // Categories API
   async getCategories() {
     return this.request('/api/categories');
@@ -100,6 +168,16 @@ class ApiService {
     });
   }
 
+  // Dashboard API: first page of goals, categories and stats in one call
+  async getDashboard(categoryId = null, limit = null) {
+    const params = new URLSearchParams();
+    if (categoryId) params.append('category_id', categoryId);
+    if (limit) params.append('limit', limit);
+
+    const queryString = params.toString();
+    return this.request(`/api/dashboard${queryString ? `?${queryString}` : ''}`);
+  }
+
   // Statistics API
   async getStats() {
     return this.request('/api/stats');